@@ -2,12 +2,15 @@
 Pytest configuration for xonai tests.
 """
 
+import io
 import sys
 from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
 
+from xonai.display import ResponseFormatter
+
 # TestEnvironment no longer needed with new AI architecture
 
 # Add the parent directory to sys.path so we can import xontrib
@@ -96,3 +99,34 @@ def dummy_ai_env(monkeypatch):
     # Enable dummy AI mode
     monkeypatch.setenv("XONAI_DUMMY", "1")
     yield
+
+
+@pytest.fixture
+def mock_claude(monkeypatch):
+    """Patch Claude CLI lookup and Popen, returning the mocked process.
+
+    Tests only need to set ``stdout``/``stderr`` (and ``wait`` for non-zero exits).
+    """
+    mock_proc = MagicMock()
+    mock_proc.stdout = iter([])
+    mock_proc.stderr = iter([])
+    mock_proc.wait.return_value = 0
+
+    monkeypatch.setattr("xonai.ai.claude.shutil.which", lambda cmd: "/usr/bin/claude")
+    monkeypatch.setattr("xonai.ai.claude.subprocess.Popen", MagicMock(return_value=mock_proc))
+
+    return mock_proc
+
+
+@pytest.fixture
+def buffer():
+    """In-memory stream receiving formatter output."""
+    return io.StringIO()
+
+
+@pytest.fixture
+def formatter(buffer):
+    """Provide a ResponseFormatter writing to the buffer fixture."""
+    formatter = ResponseFormatter(file=buffer)
+    yield formatter
+    formatter.reset()
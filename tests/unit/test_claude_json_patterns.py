@@ -1,7 +1,8 @@
 """Test various Claude CLI JSON response patterns."""
 
 import json
-from unittest.mock import Mock, patch
+
+import pytest
 
 from xonai.ai.base import (
     ErrorResponse,
@@ -16,14 +17,35 @@ from xonai.ai.claude import ClaudeAI
 class TestClaudeJSONPatterns:
     """Test various JSON patterns from Claude CLI."""
 
-    @patch("xonai.ai.claude.subprocess.Popen")
-    @patch("xonai.ai.claude.shutil.which")
-    def test_nested_tool_use_content(self, mock_which, mock_popen):
+    @pytest.mark.parametrize(
+        "tool,tool_input,expected",
+        [
+            ("Bash", {"command": "ls -la", "description": "List"}, "ls -la"),
+            ("Read", {"file_path": "/a.py"}, "/a.py"),
+            ("NotebookEdit", {"notebook_path": "/n.ipynb"}, "/n.ipynb"),
+            ("WebSearch", {"query": "xonsh"}, "xonsh"),
+            ("WebFetch", {"url": "https://example.com"}, "https://example.com"),
+            ("Grep", {"pattern": "TODO", "path": "src"}, "TODO in src"),
+            ("Glob", {"pattern": "*.py"}, "*.py"),
+            ("Task", {"description": "Find config"}, "Find config"),
+            ("LS", {"path": "/tmp", "ignore": ["*.pyc", ".git"]}, "/tmp (ignore: *.pyc, .git)"),
+            ("TodoRead", {}, "TodoRead"),
+        ],
+    )
+    def test_tool_use_content(self, mock_claude, tool, tool_input, expected):
+        """Test which tool input is surfaced as ToolUseResponse content."""
+        event = {
+            "type": "assistant",
+            "message": {"content": [{"type": "tool_use", "name": tool, "input": tool_input}]},
+        }
+        mock_claude.stdout = iter([json.dumps(event).encode() + b"\n"])
+
+        responses = list(ClaudeAI()("test"))
+
+        assert responses == [ToolUseResponse(content=expected, tool=tool)]
+
+    def test_nested_tool_use_content(self, mock_claude):
         """Test nested tool_use content patterns."""
-        mock_which.return_value = "/usr/bin/claude"
-        mock_proc = Mock()
-        mock_popen.return_value = mock_proc
-
         # Complex nested structure - Claude sends these as separate messages
         stdout_lines = [
             json.dumps({"type": "system", "subtype": "init", "model": "claude-3"}),
@@ -53,9 +75,7 @@ class TestClaudeJSONPatterns:
             json.dumps({"type": "result", "usage": {"total_tokens": 50}}),
         ]
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
-        mock_proc.stderr = iter([])
-        mock_proc.wait.return_value = 0
+        mock_claude.stdout = iter([(line + "\n").encode() for line in stdout_lines])
 
         ai = ClaudeAI()
         responses = list(ai("test"))
@@ -67,17 +87,10 @@ class TestClaudeJSONPatterns:
         assert tool_uses[0].tool == "Bash"
         assert "ls -la | grep test" in tool_uses[0].content
 
-    @patch("xonai.ai.claude.subprocess.Popen")
-    @patch("xonai.ai.claude.shutil.which")
-    def test_error_not_logged_in(self, mock_which, mock_popen):
+    def test_error_not_logged_in(self, mock_claude):
         """Test NOT_LOGGED_IN error detection."""
-        mock_which.return_value = "/usr/bin/claude"
-        mock_proc = Mock()
-        mock_popen.return_value = mock_proc
-
-        mock_proc.stdout = iter([])
-        mock_proc.stderr = iter(["Error: You are not logged in to Claude\n"])
-        mock_proc.wait.return_value = 1
+        mock_claude.stderr = iter([b"Error: You are not logged in to Claude\n"])
+        mock_claude.wait.return_value = 1
 
         ai = ClaudeAI()
         responses = list(ai("test"))
@@ -86,17 +99,10 @@ class TestClaudeJSONPatterns:
         assert len(errors) == 1
         assert errors[0].error_type == ErrorType.NOT_LOGGED_IN
 
-    @patch("xonai.ai.claude.subprocess.Popen")
-    @patch("xonai.ai.claude.shutil.which")
-    def test_network_error_detection(self, mock_which, mock_popen):
+    def test_network_error_detection(self, mock_claude):
         """Test network error detection."""
-        mock_which.return_value = "/usr/bin/claude"
-        mock_proc = Mock()
-        mock_popen.return_value = mock_proc
-
-        mock_proc.stdout = iter([])
-        mock_proc.stderr = iter(["Connection timeout: Unable to reach API\n"])
-        mock_proc.wait.return_value = 1
+        mock_claude.stderr = iter([b"Connection timeout: Unable to reach API\n"])
+        mock_claude.wait.return_value = 1
 
         ai = ClaudeAI()
         responses = list(ai("test"))
@@ -105,14 +111,38 @@ class TestClaudeJSONPatterns:
         assert len(errors) == 1
         assert errors[0].error_type == ErrorType.NETWORK_ERROR
 
-    @patch("xonai.ai.claude.subprocess.Popen")
-    @patch("xonai.ai.claude.shutil.which")
-    def test_malformed_json_recovery(self, mock_which, mock_popen):
-        """Test recovery from malformed JSON."""
-        mock_which.return_value = "/usr/bin/claude"
-        mock_proc = Mock()
-        mock_popen.return_value = mock_proc
+    @pytest.mark.parametrize(
+        "message,expected",
+        [
+            ("Network connection lost; you are Not Logged In", ErrorType.NOT_LOGGED_IN),
+            ("CONNECTION refused", ErrorType.NETWORK_ERROR),
+            ("Rate limit exceeded", None),
+        ],
+    )
+    def test_error_event_classification(self, mock_claude, message, expected):
+        """Test error type detection on streamed error events."""
+        event = {"type": "error", "error": {"message": message}}
+        mock_claude.stdout = iter([json.dumps(event).encode() + b"\n"])
+
+        responses = list(ClaudeAI()("test"))
+
+        assert responses == [ErrorResponse(content=message, error_type=expected)]
+
+    def test_stderr_keeps_tail(self, mock_claude):
+        """Test that only the last stderr lines are kept for the error message."""
+        mock_claude.stderr = iter([f"line {i}\n".encode() for i in range(5000)])
+        mock_claude.wait.return_value = 1
 
+        ai = ClaudeAI()
+        responses = list(ai("test"))
+
+        errors = [r for r in responses if isinstance(r, ErrorResponse)]
+        assert len(errors) == 1
+        assert errors[0].content.endswith("line 4999")
+        assert "line 0\n" not in errors[0].content
+
+    def test_malformed_json_recovery(self, mock_claude):
+        """Test recovery from malformed JSON."""
         stdout_lines = [
             json.dumps({"type": "system", "subtype": "init"}),
             '{"type": "content_block_delta", "delta": {"text": "Hello',  # Incomplete JSON
@@ -120,9 +150,7 @@ class TestClaudeJSONPatterns:
             json.dumps({"type": "result", "usage": {"total_tokens": 10}}),
         ]
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
-        mock_proc.stderr = iter([])
-        mock_proc.wait.return_value = 0
+        mock_claude.stdout = iter([(line + "\n").encode() for line in stdout_lines])
 
         ai = ClaudeAI()
         responses = list(ai("test"))
@@ -132,14 +160,24 @@ class TestClaudeJSONPatterns:
         assert len(messages) == 1
         assert "world" in messages[0].content
 
-    @patch("xonai.ai.claude.subprocess.Popen")
-    @patch("xonai.ai.claude.shutil.which")
-    def test_empty_tool_result(self, mock_which, mock_popen):
-        """Test empty tool result handling."""
-        mock_which.return_value = "/usr/bin/claude"
-        mock_proc = Mock()
-        mock_popen.return_value = mock_proc
+    def test_non_json_lines_skipped(self, mock_claude):
+        """Test that plain-text lines interleaved with events are ignored."""
+        stdout_lines = [
+            "Warning: something on stdout",
+            "",
+            "[1, 2, 3]",
+            '{"type": "content_block_delta", "delta": {"text": "Hi"}}',
+        ]
+
+        mock_claude.stdout = iter([(line + "\n").encode() for line in stdout_lines])
+
+        ai = ClaudeAI()
+        responses = list(ai("test"))
 
+        assert [r.content for r in responses] == ["Hi"]
+
+    def test_empty_tool_result(self, mock_claude):
+        """Test empty tool result handling."""
         stdout_lines = [
             json.dumps({"type": "system", "subtype": "init"}),
             json.dumps(
@@ -148,9 +186,7 @@ class TestClaudeJSONPatterns:
             json.dumps({"type": "result", "usage": {"total_tokens": 10}}),
         ]
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
-        mock_proc.stderr = iter([])
-        mock_proc.wait.return_value = 0
+        mock_claude.stdout = iter([(line + "\n").encode() for line in stdout_lines])
 
         ai = ClaudeAI()
         responses = list(ai("test"))
@@ -159,14 +195,29 @@ class TestClaudeJSONPatterns:
         assert len(tool_results) == 1
         assert tool_results[0].content == ""
 
-    @patch("xonai.ai.claude.subprocess.Popen")
-    @patch("xonai.ai.claude.shutil.which")
-    def test_multiple_tools_sequence(self, mock_which, mock_popen):
-        """Test multiple tools in sequence."""
-        mock_which.return_value = "/usr/bin/claude"
-        mock_proc = Mock()
-        mock_popen.return_value = mock_proc
+    def test_last_tool_reset_between_queries(self, mock_claude):
+        """Test that a reused instance doesn't carry the tool name into the next query."""
+        tool_use = json.dumps(
+            {
+                "type": "assistant",
+                "message": {"content": [{"type": "tool_use", "name": "Read", "input": {}}]},
+            }
+        )
+        tool_result = json.dumps(
+            {"type": "user", "message": {"content": [{"type": "tool_result", "content": "ok"}]}}
+        )
+        ai = ClaudeAI()
 
+        mock_claude.stdout = iter([(line + "\n").encode() for line in (tool_use, tool_result)])
+        first = [r for r in ai("first") if isinstance(r, ToolResultResponse)]
+        assert first[0].tool == "Read"
+
+        mock_claude.stdout = iter([(tool_result + "\n").encode()])
+        second = [r for r in ai("second") if isinstance(r, ToolResultResponse)]
+        assert second[0].tool == ""
+
+    def test_multiple_tools_sequence(self, mock_claude):
+        """Test multiple tools in sequence."""
         stdout_lines = [
             json.dumps({"type": "system", "subtype": "init"}),
             # First tool
@@ -213,9 +264,7 @@ class TestClaudeJSONPatterns:
             json.dumps({"type": "result", "usage": {"total_tokens": 100}}),
         ]
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
-        mock_proc.stderr = iter([])
-        mock_proc.wait.return_value = 0
+        mock_claude.stdout = iter([(line + "\n").encode() for line in stdout_lines])
 
         ai = ClaudeAI()
         responses = list(ai("test"))
@@ -1,5 +1,9 @@
 """Tests for the display module."""
 
+from dataclasses import fields
+
+import pytest
+
 from xonai.ai import (
     ContentType,
     ErrorResponse,
@@ -16,101 +20,89 @@ from xonai.display import ResponseFormatter
 class TestResponseFormatter:
     """Test the ResponseFormatter functionality."""
 
-    def test_message_response(self, capsys):
+    def test_message_response(self, formatter, buffer):
         """Test streaming message content."""
-        formatter = ResponseFormatter()
         response = MessageResponse(content="Hello world")
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == "Hello world"  # Streaming text prints without newline
+        assert buffer.getvalue() == "Hello world"  # Streaming text prints without newline
 
-    def test_init_response(self, capsys):
+    def test_init_response(self, formatter, buffer):
         """Test INIT message formatting."""
-        formatter = ResponseFormatter()
         response = InitResponse(
             content="Claude Code", session_id="1234567890abcdef", model="claude-sonnet-4-20250514"
         )
         formatter.format(response)
 
-        captured = capsys.readouterr()
         expected = "🚀 Claude Code: model=claude-sonnet-4-20250514, id=1234567890abcdef\n"
-        assert captured.out == expected
+        assert buffer.getvalue() == expected
 
-    def test_tool_use_bash(self, capsys):
-        """Test Bash tool formatting."""
+    def test_default_stream_is_stdout(self, capsys):
+        """Test that the formatter writes to stdout when no stream is given."""
         formatter = ResponseFormatter()
+        formatter.format(MessageResponse(content="Hello "))
+        formatter.format(InitResponse(content="Claude Code", session_id="abc", model="m"))
+
+        assert capsys.readouterr().out == "Hello \n🚀 Claude Code: model=m, id=abc\n"
+
+    def test_tool_use_bash(self, formatter, buffer):
+        """Test Bash tool formatting."""
         response = ToolUseResponse(content="ls -la", tool="Bash")
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == "🔧 ls -la\n"
+        assert buffer.getvalue() == "🔧 ls -la\n"
 
-    def test_tool_use_read(self, capsys):
+    def test_tool_use_read(self, formatter, buffer):
         """Test Read tool formatting."""
-        formatter = ResponseFormatter()
         response = ToolUseResponse(content="/home/user/file.txt", tool="Read")
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == "📖 Reading /home/user/file.txt\n"
+        assert buffer.getvalue() == "📖 Reading /home/user/file.txt\n"
 
-    def test_tool_use_todo_write(self, capsys):
+    def test_tool_use_todo_write(self, formatter, buffer):
         """Test TodoWrite tool formatting."""
-        formatter = ResponseFormatter()
         response = ToolUseResponse(content="TodoWrite", tool="TodoWrite")
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == "📝 Updating todos\n"
+        assert buffer.getvalue() == "📝 Updating todos\n"
 
-    def test_tool_result_empty(self, capsys):
+    def test_tool_result_empty(self, formatter, buffer):
         """Test empty tool results."""
-        formatter = ResponseFormatter()
         response = ToolResultResponse(content="", tool="Bash")
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == ""
+        assert buffer.getvalue() == ""
 
-    def test_tool_result_shown(self, capsys):
+    def test_tool_result_shown(self, formatter, buffer):
         """Test tool results are shown with tool name."""
-        formatter = ResponseFormatter()
         response = ToolResultResponse(content="Line 1\nLine 2\nLine 3", tool="Bash")
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == "  → Output: 3 lines\n"
+        assert buffer.getvalue() == "  → Output: 3 lines\n"
 
-    def test_result_response(self, capsys):
+    def test_result_response(self, formatter, buffer):
         """Test result summary formatting."""
-        formatter = ResponseFormatter()
         response = ResultResponse(
             content="duration_ms=5500, cost_usd=0.005000, input_tokens=1000, output_tokens=500",
             token=1500,
         )
         formatter.format(response)
 
-        captured = capsys.readouterr()
         expected = (
             "\n📊 duration_ms=5500, cost_usd=0.005000, "
             "input_tokens=1000, output_tokens=500, next_session_tokens=1500\n"
         )
-        assert captured.out == expected
+        assert buffer.getvalue() == expected
 
-    def test_error_response(self, capsys):
+    def test_error_response(self, formatter, buffer):
         """Test error message formatting."""
-        formatter = ResponseFormatter()
         response = ErrorResponse(content="Something went wrong", error_type=None)
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == ""
+        assert buffer.getvalue() == ""
 
-    def test_streaming_text_with_newline(self, capsys):
+    def test_streaming_text_with_newline(self, formatter, buffer):
         """Test multiple streaming messages."""
-        formatter = ResponseFormatter()
-
         # First streaming message
         formatter.format(MessageResponse(content="Hello "))
         # Second streaming message
@@ -118,49 +110,40 @@ class TestResponseFormatter:
         # Non-streaming message should be on new line
         formatter.format(ErrorResponse(content="Error"))
 
-        captured = capsys.readouterr()
-        assert captured.out == "Hello world\n"
+        assert buffer.getvalue() == "Hello world\n"
 
-    def test_tool_use_ls_with_ignore(self, capsys):
+    def test_tool_use_ls_with_ignore(self, formatter, buffer):
         """Test LS tool with ignore parameter formatting."""
-        formatter = ResponseFormatter()
         response = ToolUseResponse(
             content="/Users/akira/xonai (ignore: venv, htmlcov, *.egg-info)", tool="LS"
         )
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == "📁 ls /Users/akira/xonai (ignore: venv, htmlcov, *.egg-info)\n"
+        assert buffer.getvalue() == "📁 ls /Users/akira/xonai (ignore: venv, htmlcov, *.egg-info)\n"
 
-    def test_tool_use_websearch(self, capsys):
+    def test_tool_use_websearch(self, formatter, buffer):
         """Test WebSearch tool formatting."""
-        formatter = ResponseFormatter()
         response = ToolUseResponse(content="site:pypi.org xonai", tool="WebSearch")
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == "🔍 Searching: site:pypi.org xonai\n"
+        assert buffer.getvalue() == "🔍 Searching: site:pypi.org xonai\n"
 
-    def test_error_types(self, capsys):
+    def test_error_types(self, formatter, buffer):
         """Test error response with different error types."""
-        formatter = ResponseFormatter()
-
         # Test with NOT_LOGGED_IN error type
         response = ErrorResponse(
             content="Please log in to Claude CLI", error_type=ErrorType.NOT_LOGGED_IN
         )
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == ""
+        assert buffer.getvalue() == ""
 
         # Test with None error type (unexpected error)
-        formatter = ResponseFormatter()
+        formatter.reset()
         response = ErrorResponse(content="Unexpected error occurred", error_type=None)
         formatter.format(response)
 
-        captured = capsys.readouterr()
-        assert captured.out == ""
+        assert buffer.getvalue() == ""
 
     def test_content_type_defaults(self):
         """Test content type defaults for different response types."""
@@ -183,3 +166,11 @@ class TestResponseFormatter:
 
         final = ResultResponse(content="stats", token=100)
         assert final.content_type == ContentType.TEXT
+
+    def test_content_type_is_per_type(self):
+        """Test that content type is fixed per response type, not per instance."""
+        assert MessageResponse.content_type == ContentType.MARKDOWN
+        assert "content_type" not in {f.name for f in fields(MessageResponse)}
+
+        with pytest.raises(TypeError):
+            ToolUseResponse(content="{}", content_type=ContentType.JSON, tool="Generic")
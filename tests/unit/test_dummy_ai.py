@@ -0,0 +1,34 @@
+"""Test the DummyAI streaming simulation."""
+
+from unittest.mock import patch
+
+import pytest
+
+from xonai.ai.base import MessageResponse
+from xonai.ai.dummy import DummyAI
+
+
+class TestDummyAI:
+    """Test DummyAI response streaming."""
+
+    def test_chunk_size_groups_words(self):
+        """Test that each MessageResponse carries chunk_size words."""
+        ai = DummyAI(delay=0, chunk_size=3)
+        chunks = [r.content for r in ai("hi") if isinstance(r, MessageResponse)]
+
+        assert chunks == ["I received your ", "prompt: 'hi'. This ", "is a dummy ", "response."]
+        assert "".join(chunks) == "I received your prompt: 'hi'. This is a dummy response."
+
+    def test_zero_delay_never_sleeps(self):
+        """Test that delay=0 streams without calling time.sleep."""
+        with patch("xonai.ai.dummy.time.sleep") as mock_sleep:
+            responses = list(DummyAI(delay=0)("search files"))
+
+        assert len(responses) > 2
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.parametrize("chunk_size", [0, -1])
+    def test_invalid_chunk_size(self, chunk_size):
+        """Test that a chunk_size below 1 is rejected up front."""
+        with pytest.raises(ValueError, match="chunk_size"):
+            DummyAI(chunk_size=chunk_size)
@@ -1,7 +1,6 @@
 """Test xonai command handler functionality."""
 
 import os
-import subprocess
 import sys
 from unittest.mock import Mock, patch
 
@@ -42,9 +41,17 @@ class TestHandler:
             ai = get_ai_instance()
             assert ai.__class__.__name__ == "DummyAI"
 
+    def test_get_ai_instance_reused(self):
+        """Test that the AI instance is reused while the mode is unchanged."""
+        with patch.dict(os.environ, {"XONAI_DUMMY": "1"}):
+            ai = get_ai_instance()
+            assert get_ai_instance() is ai
+        with patch.dict(os.environ, {}, clear=True):
+            assert get_ai_instance() is not ai
+
     @patch("xonai.handler.get_ai_instance")
-    @patch("xonai.handler.ResponseFormatter")
-    def test_process_natural_language_query(self, mock_formatter_class, mock_get_ai):
+    @patch("xonai.handler._get_formatter")
+    def test_process_natural_language_query(self, mock_get_formatter, mock_get_ai):
         """Test processing natural language query."""
         # Setup mocks
         mock_ai = Mock()
@@ -55,14 +62,16 @@ class TestHandler:
         mock_get_ai.return_value = mock_ai
 
         mock_formatter = Mock()
-        mock_formatter_class.return_value = mock_formatter
+        mock_get_formatter.return_value = mock_formatter
 
         # Test
         process_natural_language_query("test query")
 
         # Verify
         mock_ai.assert_called_once_with("test query")
+        mock_formatter.reset.assert_called_once()
         assert mock_formatter.format.call_count == 2
+        mock_formatter.flush.assert_called_once()
 
     def test_should_skip_command_empty_args(self):
         """Test skipping empty args."""
@@ -95,34 +104,16 @@ class TestHandler:
             assert should_skip_command(query) is False
 
     @patch("subprocess.Popen")
-    def test_create_dummy_process_unix(self, mock_popen):
-        """Test creating dummy process on Unix."""
-        with patch.object(sys, "platform", "linux"):
-            mock_process = Mock()
-            mock_popen.return_value = mock_process
-
-            result = create_dummy_process()
-
-            mock_popen.assert_called_once_with(
-                ["true"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-            )
-            assert result == mock_process
-
-    @patch("subprocess.Popen")
-    def test_create_dummy_process_windows(self, mock_popen):
-        """Test creating dummy process on Windows."""
-        with patch.object(sys, "platform", "win32"):
-            mock_process = Mock()
-            mock_popen.return_value = mock_process
-
-            result = create_dummy_process()
-
-            mock_popen.assert_called_once_with(
-                ["cmd", "/c", "exit", "0"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            assert result == mock_process
+    def test_create_dummy_process(self, mock_popen):
+        """Test that the dummy process has already exited successfully."""
+        process = create_dummy_process()
+
+        mock_popen.assert_not_called()
+        assert process.pid is None
+        assert process.returncode == 0
+        assert process.poll() == 0
+        assert process.wait() == 0
+        assert process.stdout is None and process.stderr is None
 
     @patch("xonai.handler.create_dummy_process")
     @patch("xonai.handler.process_natural_language_query")
@@ -30,10 +30,10 @@ class TestSubprocessHandling:
         ]
 
         # Simulate large stderr output that could cause deadlock
-        stderr_lines = ["Error line " + str(i) + "\n" for i in range(1000)]
+        stderr_lines = [f"Error line {i}\n".encode() for i in range(1000)]
 
         # Mock stdout as an iterator
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
+        mock_proc.stdout = iter([(line + "\n").encode() for line in stdout_lines])
 
         # Mock stderr to simulate blocking behavior
         class MockStderr:
@@ -87,7 +87,7 @@ class TestSubprocessHandling:
 
         # Mock stdout to raise KeyboardInterrupt after first line
         def stdout_generator():
-            yield json.dumps({"type": "system", "subtype": "init"}) + "\n"
+            yield json.dumps({"type": "system", "subtype": "init"}).encode() + b"\n"
             raise KeyboardInterrupt()
 
         mock_proc.stdout = stdout_generator()
@@ -126,7 +126,7 @@ class TestSubprocessHandling:
             json.dumps({"type": "result", "usage": {"input_tokens": 10, "output_tokens": 20}}),
         ]
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
+        mock_proc.stdout = iter([(line + "\n").encode() for line in stdout_lines])
         mock_proc.stderr = iter([])
         mock_proc.wait.return_value = 0
 
@@ -168,7 +168,7 @@ class TestSubprocessHandling:
             json.dumps({"type": "result", "usage": {"total_tokens": 10}}),
         ]
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
+        mock_proc.stdout = iter([(line + "\n").encode() for line in stdout_lines])
         mock_proc.stderr = iter([])
         mock_proc.wait.return_value = 0
 
@@ -181,3 +181,34 @@ class TestSubprocessHandling:
         assert len(tool_results) == 1
         assert isinstance(tool_results[0].content, str)
         assert tool_results[0].content == "line1\nline2\nline3"
+
+    @patch("xonai.ai.claude.subprocess.Popen")
+    @patch("xonai.ai.claude.shutil.which")
+    def test_cli_path_resolved_once(self, mock_which, mock_popen):
+        """Test that the Claude CLI path is looked up once and used for argv."""
+        mock_which.return_value = "/opt/bin/claude"
+
+        mock_proc = Mock()
+        mock_proc.stdout = iter([])
+        mock_proc.stderr = iter([])
+        mock_proc.wait.return_value = 0
+        mock_popen.return_value = mock_proc
+
+        ai = ClaudeAI()
+        list(ai("first"))
+        mock_proc.stdout = iter([])
+        mock_proc.stderr = iter([])
+        list(ai("second"))
+
+        mock_which.assert_called_once()
+        assert mock_popen.call_args[0][0][0] == "/opt/bin/claude"
+
+    @patch("xonai.ai.claude.shutil.which")
+    def test_cli_not_found_not_cached(self, mock_which):
+        """Test that a failed lookup is retried on the next check."""
+        mock_which.return_value = None
+        ai = ClaudeAI()
+        assert ai.is_available is False
+
+        mock_which.return_value = "/usr/bin/claude"
+        assert ai.is_available is True
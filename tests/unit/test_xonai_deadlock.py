@@ -100,8 +100,8 @@ class TestXonaiDeadlock:
             * 10
         )  # Repeat to simulate verbose output
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_lines])
-        mock_proc.stderr = iter(stderr_content.split("\n"))
+        mock_proc.stdout = iter([(line + "\n").encode() for line in stdout_lines])
+        mock_proc.stderr = iter(stderr_content.encode().split(b"\n"))
         mock_proc.wait.return_value = 0
 
         # Run the query
@@ -137,7 +137,7 @@ class TestXonaiDeadlock:
         # Create a custom stderr that would block if read sequentially
         class BlockingStderr:
             def __init__(self):
-                self.data = ["Error: " + "x" * 8192 + "\n"] * 10  # Large stderr data
+                self.data = [b"Error: " + b"x" * 8192 + b"\n"] * 10  # Large stderr data
                 self.index = 0
 
             def __iter__(self):
@@ -162,7 +162,7 @@ class TestXonaiDeadlock:
             json.dumps({"type": "result", "usage": {"input_tokens": 1000, "output_tokens": 500}})
         )
 
-        mock_proc.stdout = iter([line + "\n" for line in stdout_data])
+        mock_proc.stdout = iter([(line + "\n").encode() for line in stdout_data])
         mock_proc.stderr = BlockingStderr()
         mock_proc.wait.return_value = 1  # Error exit
 
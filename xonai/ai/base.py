@@ -1,10 +1,14 @@
 """Base classes for AI model implementations."""
 
+import sys
 from abc import ABC, abstractmethod
 from collections.abc import Generator
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Optional
+from typing import ClassVar, Optional
+
+# Slotted responses drop the per-instance __dict__; slots= needs Python 3.10+
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 class ContentType(Enum):
@@ -23,88 +27,76 @@ class ErrorType(Enum):
     NETWORK_ERROR = auto()
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Response:
     """Base class for all AI responses."""
 
+    # Per-type constants, shared by all instances rather than stored on each
+    kind: ClassVar[str] = ""  # Dispatch tag
+    content_type: ClassVar[ContentType] = ContentType.TEXT
+
     content: str
-    content_type: ContentType = ContentType.TEXT
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class InitResponse(Response):
     """Initialization response with session information."""
 
+    kind: ClassVar[str] = "init"
+
     session_id: Optional[str] = None
     model: Optional[str] = None
 
-    def __post_init__(self):
-        """Set default content type."""
-        if not hasattr(self, "_content_type_set"):
-            self.content_type = ContentType.TEXT
-
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class MessageResponse(Response):
     """Text message response from AI."""
 
-    def __post_init__(self):
-        """Set default content type to MARKDOWN for Claude."""
-        if not hasattr(self, "_content_type_set"):
-            self.content_type = ContentType.MARKDOWN
+    kind: ClassVar[str] = "message"
+    content_type: ClassVar[ContentType] = ContentType.MARKDOWN
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ToolUseResponse(Response):
     """Tool usage response."""
 
-    tool: str = ""
+    kind: ClassVar[str] = "tool_use"
 
-    def __post_init__(self):
-        """Set default content type."""
-        if not hasattr(self, "_content_type_set"):
-            self.content_type = ContentType.TEXT
+    tool: str = ""
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ToolResultResponse(Response):
     """Tool execution result response."""
 
-    tool: str = ""
+    kind: ClassVar[str] = "tool_result"
 
-    def __post_init__(self):
-        """Set default content type."""
-        if not hasattr(self, "_content_type_set"):
-            self.content_type = ContentType.TEXT
+    tool: str = ""
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ErrorResponse(Response):
     """Error response."""
 
-    error_type: Optional[ErrorType] = None
+    kind: ClassVar[str] = "error"
 
-    def __post_init__(self):
-        """Set default content type."""
-        if not hasattr(self, "_content_type_set"):
-            self.content_type = ContentType.TEXT
+    error_type: Optional[ErrorType] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ResultResponse(Response):
     """Final result response with statistics."""
 
-    token: int = 0
+    kind: ClassVar[str] = "result"
 
-    def __post_init__(self):
-        """Set default content type."""
-        if not hasattr(self, "_content_type_set"):
-            self.content_type = ContentType.TEXT
+    token: int = 0
 
 
 class BaseAI(ABC):
     """Base class for all AI model implementations."""
 
+    __slots__ = ()  # Lets subclasses opt into __slots__
+
     @abstractmethod
     def __call__(self, prompt: str) -> Generator[Response, None, None]:
         """
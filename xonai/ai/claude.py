@@ -2,12 +2,14 @@
 
 import json
 import os
+import re
 import shutil
 import subprocess
 import sys
 import threading
-from collections.abc import Generator
-from typing import Optional
+from collections import deque
+from collections.abc import Callable, Generator, Iterable
+from typing import Any, Optional
 
 from .base import (
     BaseAI,
@@ -21,14 +23,101 @@ from .base import (
     ToolUseResponse,
 )
 
+_json_loads: Callable[[bytes], Any]
+try:
+    # Optional C decoder for the stream; orjson.JSONDecodeError subclasses json's
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Static CLI arguments for streaming JSON output; the prompt is appended per call
+_CLAUDE_ARGS = ("--print", "--verbose", "--output-format", "stream-json")
+
+# Read buffer for the CLI pipes (the io default is 8 KiB)
+_PIPE_BUFSIZE = 1 << 16
+
+# Keep only the tail of stderr; the error message is at the end and memory stays bounded
+_STDERR_MAX_LINES = 1024
+
+
+# Error text patterns, checked in priority order
+_ERROR_PATTERNS = (
+    (re.compile("not logged in", re.IGNORECASE), ErrorType.NOT_LOGGED_IN),
+    (re.compile("network|connection", re.IGNORECASE), ErrorType.NETWORK_ERROR),
+)
+
+
+def _classify_error(text: str) -> Optional[ErrorType]:
+    """Determine the error type from CLI error text, if recognizable."""
+    for pattern, error_type in _ERROR_PATTERNS:
+        if pattern.search(text):
+            return error_type
+    return None
+
+
+def _file_path(tool_input: dict) -> str:
+    """File argument of the read/edit tools."""
+    path: str = tool_input.get("file_path", "") or tool_input.get("notebook_path", "")
+    return path
+
+
+def _search_pattern(tool_input: dict) -> str:
+    """Pattern, plus the search root when given, of Glob/Grep."""
+    pattern = tool_input.get("pattern", "")
+    path = tool_input.get("path", "")
+    return f"{pattern} in {path}" if path else pattern
+
+
+def _ls_path(tool_input: dict) -> str:
+    """Directory, plus any ignore globs, of LS."""
+    path = tool_input.get("path", "")
+    ignore = tool_input.get("ignore", [])
+    return f"{path} (ignore: {', '.join(ignore)})" if ignore else path
+
+
+# Tool name -> extractor of the input shown in ToolUseResponse.content
+_TOOL_EXTRACTORS: dict[str, Callable[[dict], str]] = {
+    "Bash": lambda tool_input: tool_input.get("command", ""),
+    "Read": _file_path,
+    "NotebookRead": _file_path,
+    "Edit": _file_path,
+    "Write": _file_path,
+    "MultiEdit": _file_path,
+    "NotebookEdit": _file_path,
+    "WebSearch": lambda tool_input: tool_input.get("query", ""),
+    "WebFetch": lambda tool_input: tool_input.get("url", ""),
+    "Glob": _search_pattern,
+    "Grep": _search_pattern,
+    "Task": lambda tool_input: tool_input.get("description", ""),
+    "LS": _ls_path,
+}
+
+
+def _drain(stream: Optional[Iterable[bytes]], sink: "deque[bytes]") -> None:
+    """Read a pipe to EOF so the child never blocks on a full buffer."""
+    if stream:
+        for line in stream:
+            sink.append(line)
+
 
 class ClaudeAI(BaseAI):
     """Claude AI implementation using Claude CLI."""
 
-    def __init__(self):
+    def __init__(self) -> None:
         """Initialize Claude AI."""
         self._claude_cmd = "dummy_claude" if os.environ.get("XONAI_DUMMY") == "1" else "claude"
-        self._last_tool = None  # Track last tool for ToolResultResponse
+        self._claude_path: Optional[str] = None  # Resolved on first successful lookup
+        self._last_tool: Optional[str] = None  # Track last tool for ToolResultResponse
+        # Stream event 'type' -> parser
+        self._handlers: dict[str, Callable[[dict], Optional[Response]]] = {
+            "system": self._handle_system,
+            "assistant": self._handle_assistant,
+            "user": self._handle_user,
+            "error": self._handle_error,
+            "result": self._handle_result,
+        }
 
     @property
     def name(self) -> str:
@@ -38,7 +127,10 @@ class ClaudeAI(BaseAI):
     @property
     def is_available(self) -> bool:
         """Check if Claude CLI is available."""
-        return shutil.which(self._claude_cmd) is not None
+        # Only a hit is cached so installing the CLI mid-session is still picked up
+        if self._claude_path is None:
+            self._claude_path = shutil.which(self._claude_cmd)
+        return self._claude_path is not None
 
     def __call__(self, prompt: str) -> Generator[Response, None, None]:
         """
@@ -50,6 +142,9 @@ class ClaudeAI(BaseAI):
         Yields:
             Response: Structured responses from Claude
         """
+        # The instance is shared across queries; don't leak the previous query's tool
+        self._last_tool = None
+
         if not self.is_available:
             yield ErrorResponse(
                 content="Claude CLI not found. Please install Claude CLI.",
@@ -58,45 +153,35 @@ class ClaudeAI(BaseAI):
             return
 
         try:
-            # Build command with streaming JSON output
-            cmd = [
-                self._claude_cmd,
-                "--print",
-                "--verbose",
-                "--output-format",
-                "stream-json",
-                prompt,
-            ]
-
-            # Use subprocess.Popen for streaming output
+            # Build command with streaming JSON output (argv list, no shell involved)
+            cmd = [self._claude_path or self._claude_cmd, *_CLAUDE_ARGS, prompt]
+
+            # Use subprocess.Popen for streaming output. The pipes stay binary: the JSON
+            # decoders accept bytes, so stdout lines never go through a text codec.
+            # A large buffer lets one read() pick up a whole burst of events; it
+            # returns whatever is available, so lines are not held back
             proc = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,  # Line-buffered for better handling
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=_PIPE_BUFSIZE
             )
 
             # Collect stderr in background thread to avoid deadlock
-            stderr_lines = []
-
-            def read_stderr():
-                if proc.stderr:
-                    for line in proc.stderr:
-                        stderr_lines.append(line)
-
-            stderr_thread = threading.Thread(target=read_stderr)
+            stderr_lines: deque[bytes] = deque(maxlen=_STDERR_MAX_LINES)
+            stderr_thread = threading.Thread(
+                target=_drain, args=(proc.stderr, stderr_lines), daemon=True
+            )
             stderr_thread.start()
 
             # Process streaming output
             if proc.stdout:
                 for line in proc.stdout:
-                    line = line.strip()
-                    if not line:
+                    # Every stream-json event is an object starting at column 0; skip
+                    # blank or plain-text lines without paying for a failed parse. The
+                    # trailing newline is left for the decoder, which ignores it
+                    if not line.startswith(b"{"):
                         continue
 
                     try:
-                        data = json.loads(line)
+                        data = _json_loads(line)
                         response = self._parse_claude_response(data)
                         if response:
                             yield response
@@ -109,19 +194,11 @@ class ClaudeAI(BaseAI):
 
             # Check for stderr output (errors)
             if stderr_lines:
-                stderr_output = "".join(stderr_lines).strip()
+                stderr_output = b"".join(stderr_lines).decode(errors="replace").strip()
                 if stderr_output:
-                    # Check for specific error types
-                    error_text = stderr_output
-                    error_type = None
-                    if "not logged in" in error_text.lower():
-                        error_type = ErrorType.NOT_LOGGED_IN
-                    elif "network" in error_text.lower() or "connection" in error_text.lower():
-                        error_type = ErrorType.NETWORK_ERROR
-
                     yield ErrorResponse(
-                        content=error_text,
-                        error_type=error_type,
+                        content=stderr_output,
+                        error_type=_classify_error(stderr_output),
                     )
 
             # Wait for completion and check exit code
@@ -161,135 +238,103 @@ class ClaudeAI(BaseAI):
         Returns:
             Response or None if the data should be skipped
         """
-        # Parse based on 'type' field in the JSON
         msg_type = data.get("type", "")
+        if msg_type == "content_block_delta":
+            # Streaming text deltas are the bulk of the stream; handle them inline
+            text = data.get("delta", {}).get("text", "")
+            return MessageResponse(content=text) if text else None
+
+        # Dispatch everything else on the 'type' field; other types are skipped
+        handler = self._handlers.get(msg_type)
+        return handler(data) if handler else None
+
+    def _handle_system(self, data: dict) -> Optional[Response]:
+        """INIT message with session info."""
+        if data.get("subtype") != "init":
+            return None
+        return InitResponse(
+            content="Claude Code",
+            session_id=data.get("session_id", ""),
+            model=data.get("model", "unknown"),
+        )
+
+    def _handle_assistant(self, data: dict) -> Optional[Response]:
+        """Assistant message (may contain text or tool use)."""
+        message = data.get("message", {})
+        content = message.get("content", [])
+
+        for item in content:
+            if item.get("type") == "text":
+                text = item.get("text", "")
+                if text.strip():  # Check if non-empty after stripping
+                    # Add newline before assistant messages, but preserve original text
+                    return MessageResponse(content=f"\n{text}")
+            elif item.get("type") == "tool_use":
+                # Tool usage
+                tool_name = item.get("name", "unknown")
+                tool_input = item.get("input", {})
+
+                # Track last tool
+                self._last_tool = tool_name
+
+                # Extract content based on tool; unknown tools show their name
+                extract = _TOOL_EXTRACTORS.get(tool_name)
+                content = extract(tool_input) if extract else tool_name
+
+                return ToolUseResponse(
+                    content=content,
+                    tool=tool_name,
+                )
+        return None
 
-        if msg_type == "system" and data.get("subtype") == "init":
-            # INIT message with session info
-            return InitResponse(
-                content="Claude Code",
-                session_id=data.get("session_id", ""),
-                model=data.get("model", "unknown"),
-            )
-
-        elif msg_type == "content_block_delta":
-            # Streaming text content
-            delta = data.get("delta", {})
-            text = delta.get("text", "")
-            if text:
-                return MessageResponse(content=text)
-
-        elif msg_type == "assistant":
-            # Assistant message (may contain text or tool use)
-            message = data.get("message", {})
-            content = message.get("content", [])
-
-            for item in content:
-                if item.get("type") == "text":
-                    text = item.get("text", "")
-                    if text.strip():  # Check if non-empty after stripping
-                        # Add newline before assistant messages, but preserve original text
-                        return MessageResponse(content=f"\n{text}")
-                elif item.get("type") == "tool_use":
-                    # Tool usage
-                    tool_name = item.get("name", "unknown")
-                    tool_input = item.get("input", {})
-
-                    # Track last tool
-                    self._last_tool = tool_name
-
-                    # Extract content based on tool
-                    content = tool_name
-                    if tool_name == "Bash":
-                        content = tool_input.get("command", "")
-                    elif tool_name in ["Read", "NotebookRead"]:
-                        content = tool_input.get("file_path", "") or tool_input.get(
-                            "notebook_path", ""
-                        )
-                    elif tool_name in ["Edit", "Write", "MultiEdit", "NotebookEdit"]:
-                        content = tool_input.get("file_path", "") or tool_input.get(
-                            "notebook_path", ""
-                        )
-                    elif tool_name == "WebSearch":
-                        content = tool_input.get("query", "")
-                    elif tool_name == "WebFetch":
-                        content = tool_input.get("url", "")
-                    elif tool_name in ["Glob", "Grep"]:
-                        pattern = tool_input.get("pattern", "")
-                        path = tool_input.get("path", "")
-                        content = f"{pattern} in {path}" if path else pattern
-                    elif tool_name == "Task":
-                        content = tool_input.get("description", "")
-                    elif tool_name == "LS":
-                        path = tool_input.get("path", "")
-                        ignore = tool_input.get("ignore", [])
-                        if ignore:
-                            content = f"{path} (ignore: {', '.join(ignore)})"
-                        else:
-                            content = path
-
-                    return ToolUseResponse(
-                        content=content,
-                        tool=tool_name,
-                    )
-
-        elif msg_type == "user":
-            # User message (tool results)
-            content = data.get("message", {}).get("content", [])
-
-            for item in content:
-                if item.get("type") == "tool_result":
-                    result_content = item.get("content", "")
-                    # Handle case where content might be a list
-                    if isinstance(result_content, list):
-                        result_content = "\n".join(str(line) for line in result_content)
-                    return ToolResultResponse(
-                        content=result_content,
-                        tool=self._last_tool or "",
-                    )
-
-        elif msg_type == "error":
-            # Error message
-            error = data.get("error", {})
-            message = error.get("message", data.get("message", "Unknown error"))
-
-            # Try to determine error type
-            error_type = None
-            if "not logged in" in message.lower():
-                error_type = ErrorType.NOT_LOGGED_IN
-            elif "network" in message.lower() or "connection" in message.lower():
-                error_type = ErrorType.NETWORK_ERROR
-
-            return ErrorResponse(
-                content=message,
-                error_type=error_type,
-            )
-
-        elif msg_type == "result":
-            # Final result with stats
-            usage = data.get("usage", {})
-            duration_ms = data.get("duration_ms", 0)
-            cost_usd = data.get("cost_usd", 0)
-            input_tokens = usage.get("input_tokens", 0)
-            output_tokens = usage.get("output_tokens", 0)
-
-            # Format content string
-            content = (
-                f"duration_ms={duration_ms}, cost_usd={cost_usd:.6f}, "
-                f"input_tokens={input_tokens}, output_tokens={output_tokens}"
-            )
-
-            # Calculate total tokens for next session
-            total_tokens = input_tokens + output_tokens
-
-            return ResultResponse(
-                content=content,
-                token=total_tokens,
-            )
-
-        # Skip other types
+    def _handle_user(self, data: dict) -> Optional[Response]:
+        """User message (tool results)."""
+        content = data.get("message", {}).get("content", [])
+
+        for item in content:
+            if item.get("type") == "tool_result":
+                result_content = item.get("content", "")
+                # Handle case where content might be a list
+                if isinstance(result_content, list):
+                    result_content = "\n".join(str(line) for line in result_content)
+                return ToolResultResponse(
+                    content=result_content,
+                    tool=self._last_tool or "",
+                )
         return None
 
+    def _handle_error(self, data: dict) -> Optional[Response]:
+        """Error message."""
+        error = data.get("error", {})
+        message = error.get("message", data.get("message", "Unknown error"))
+
+        return ErrorResponse(
+            content=message,
+            error_type=_classify_error(message),
+        )
+
+    def _handle_result(self, data: dict) -> Optional[Response]:
+        """Final result with stats."""
+        usage = data.get("usage", {})
+        duration_ms = data.get("duration_ms", 0)
+        cost_usd = data.get("cost_usd", 0)
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+
+        # Format content string
+        content = (
+            f"duration_ms={duration_ms}, cost_usd={cost_usd:.6f}, "
+            f"input_tokens={input_tokens}, output_tokens={output_tokens}"
+        )
+
+        # Calculate total tokens for next session
+        total_tokens = input_tokens + output_tokens
+
+        return ResultResponse(
+            content=content,
+            token=total_tokens,
+        )
+
 
 def open_claude_docs():
     """Open Claude documentation in browser."""
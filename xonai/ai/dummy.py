@@ -13,18 +13,30 @@ from .base import (
     ToolUseResponse,
 )
 
+# Prompt keywords that make the dummy simulate a tool call
+_TOOL_TRIGGERS = ("file", "search")
+
 
 class DummyAI(BaseAI):
     """Dummy AI implementation for testing purposes."""
 
-    def __init__(self, delay: float = 0.1):
+    __slots__ = ("delay", "chunk_size", "_session_counter", "_last_tool")
+
+    def __init__(self, delay: float = 0.1, chunk_size: int = 1):
         """
         Initialize Dummy AI.
 
         Args:
             delay: Delay between yielding responses (simulates streaming)
+            chunk_size: Number of words per streamed MessageResponse
+
+        Raises:
+            ValueError: If chunk_size is less than 1
         """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
         self.delay = delay
+        self.chunk_size = chunk_size
         self._session_counter = 0
         self._last_tool: str = ""  # Track last tool for ToolResultResponse
 
@@ -38,6 +50,11 @@ class DummyAI(BaseAI):
         """Dummy AI is always available."""
         return True
 
+    def _pause(self) -> None:
+        """Sleep between responses; skipped entirely when delay is 0."""
+        if self.delay:
+            time.sleep(self.delay)
+
     def __call__(self, prompt: str) -> Generator[Response, None, None]:
         """
         Process a prompt and yield dummy responses.
@@ -55,39 +72,42 @@ class DummyAI(BaseAI):
             session_id=f"dummy-session-{self._session_counter}",
             model="dummy-model",
         )
-        time.sleep(self.delay)
+        self._pause()
 
         # Simulate streaming message response
         response_text = f"I received your prompt: '{prompt}'. This is a dummy response."
         words = response_text.split()
+        word_count = len(words)
 
-        for i, word in enumerate(words):
+        for start in range(0, word_count, self.chunk_size):
+            end = start + self.chunk_size
             yield MessageResponse(
-                content=word + (" " if i < len(words) - 1 else ""),
+                content=" ".join(words[start:end]) + (" " if end < word_count else ""),
             )
-            time.sleep(self.delay)
+            self._pause()
 
         # Simulate tool usage
-        if "file" in prompt.lower() or "search" in prompt.lower():
+        lowered = prompt.lower()
+        if any(trigger in lowered for trigger in _TOOL_TRIGGERS):
             tool_name = "Grep"
             self._last_tool = tool_name
             yield ToolUseResponse(
                 content="search pattern in files",
                 tool=tool_name,
             )
-            time.sleep(self.delay)
+            self._pause()
 
             yield ToolResultResponse(
                 content="Found 3 matching files",
                 tool=self._last_tool,
             )
-            time.sleep(self.delay)
+            self._pause()
 
         # Simulate completion
-        duration_ms = int((len(words) + 3) * self.delay * 1000)
+        duration_ms = int((word_count + 3) * self.delay * 1000)
         cost_usd = 0.001
         input_tokens = len(prompt.split())
-        output_tokens = len(response_text.split())
+        output_tokens = word_count
         total_tokens = input_tokens + output_tokens
 
         yield ResultResponse(
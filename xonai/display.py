@@ -1,9 +1,13 @@
 """Display formatting for AI responses with emoji-based indicators."""
 
+import codecs
+import json
+import os
 import shutil
-from typing import Optional
+import sys
+from typing import Any, Callable, Optional, TextIO
 
-from rich.console import Console
+from rich.cells import cell_len, get_character_cell_size
 from rich.text import Text
 
 from .ai import (
@@ -16,15 +20,130 @@ from .ai import (
     ToolUseResponse,
 )
 
+# Maximum number of lines kept by _truncate_to_width
+_MAX_LINES = 5
+
+# Output modes: streamed text as-is, a complete line, or a line set off by a blank line
+_STREAM = "stream"
+_LINE = "line"
+_BLOCK = "block"
+
+# Bash commands longer than this are cut, independent of terminal width
+_BASH_MAX_LENGTH = 60
+
+# Tool use prefixes for tools that display their content as-is
+_TOOL_USE_PREFIXES = {
+    "LS": "📁 ls ",
+    "Read": "📖 Reading ",
+    "NotebookRead": "📖 Reading ",
+    "Edit": "✏️ Editing ",
+    "Write": "✏️ Editing ",
+    "MultiEdit": "✏️ Editing ",
+    "NotebookEdit": "✏️ Editing ",
+    "WebSearch": "🔍 Searching: ",
+    "WebFetch": "🌐 Fetching: ",
+    "Task": "🤖 Task: ",
+}
+
+# Tool uses shown with a fixed label regardless of content
+_TOOL_USE_LABELS = {
+    "TodoRead": "📋 Reading todos",
+    "TodoWrite": "📝 Updating todos",
+}
+
+# Tool results that are summarized with a fixed message
+_TOOL_RESULT_SUMMARIES = {
+    "Edit": "  → File updated",
+    "MultiEdit": "  → File updated",
+    "Write": "  → File written",
+    "TodoWrite": "  → Todos updated",
+}
+
+
+def _terminal_width() -> int:
+    """Return the current terminal width in columns."""
+    columns, _ = shutil.get_terminal_size(fallback=(80, 24))
+    return columns
+
+
+def _is_terminal(stream: TextIO) -> bool:
+    """Return whether the stream is attached to a terminal."""
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def _terminal_fd(stream: TextIO) -> Optional[int]:
+    """Return the fd of a UTF-8 terminal stream, or None if it isn't one."""
+    if sys.platform == "win32":
+        # Windows consoles don't take raw UTF-8 bytes on the fd
+        return None
+    try:
+        if stream.isatty() and codecs.lookup(stream.encoding).name == "utf-8":
+            return stream.fileno()
+    except (AttributeError, LookupError, OSError, TypeError, ValueError):
+        pass
+    return None
+
 
 class ResponseFormatter:
     """Format and display AI responses with rich formatting."""
 
-    def __init__(self):
-        """Initialize the formatter."""
-        self.console = Console(force_terminal=True, legacy_windows=False)
+    # Attributes are touched for every streamed chunk; slots skip the instance dict
+    __slots__ = (
+        "_file",
+        "_current_tool",
+        "_last_was_newline",
+        "_fd",
+        "_live",
+        "_formatters",
+        "_term_width",
+    )
+
+    def __init__(self, file: Optional[TextIO] = None) -> None:
+        """
+        Initialize the formatter.
+
+        Args:
+            file: Stream to write to; defaults to whatever sys.stdout is at write time
+        """
+        self._file = file
+        self._current_tool: Optional[str] = None
+        self._last_was_newline = True
+        self._probe_output()
+        # Response kind -> (formatter, output mode); subclasses inherit their parent's kind
+        self._formatters: dict[str, tuple[Callable[[Any], str], str]] = {
+            InitResponse.kind: (self._format_init, _LINE),
+            MessageResponse.kind: (self._format_message, _STREAM),
+            ToolUseResponse.kind: (self._format_tool_use, _LINE),
+            ToolResultResponse.kind: (self._format_tool_result, _LINE),
+            ErrorResponse.kind: (self._format_error, _LINE),
+            ResultResponse.kind: (self._format_result, _BLOCK),
+        }
+
+    def flush(self) -> None:
+        """Flush output buffered by the stream."""
+        self._flush()
+
+    def reset(self) -> None:
+        """Flush pending output and reset per-query state."""
+        self.flush()
         self._current_tool = None
         self._last_was_newline = True
+        # stdout may have been redirected or the terminal resized since the last query
+        self._probe_output()
+
+    def _probe_output(self) -> None:
+        """Cache per-query facts about the output stream and terminal."""
+        stream = sys.stdout if self._file is None else self._file
+        # UTF-8 terminals get complete lines written straight to the fd
+        self._fd = _terminal_fd(stream)
+        # Only a terminal needs each streamed chunk flushed; pipes and files are
+        # left to the stream's buffer and flushed once per query
+        self._live = _is_terminal(stream)
+        # Terminal width is looked up lazily, at most once per query
+        self._term_width: Optional[int] = None
 
     def format(self, response: Response) -> None:
         """
@@ -33,47 +152,52 @@ class ResponseFormatter:
         Args:
             response: The Response to format and display
         """
-        output = self._format_response(response)
-        if output:
-            if isinstance(response, MessageResponse):
-                # Streaming text - print without newline
-                print(output, end="", flush=True)
-                self._last_was_newline = output.endswith("\n")
-            elif isinstance(response, InitResponse):
-                # Init on new line if needed
-                if not self._last_was_newline:
-                    print()
-                print(output)
-                self._last_was_newline = True
-            elif isinstance(response, ResultResponse):
-                # Result gets a blank line before
-                if not self._last_was_newline:
-                    print()
-                print()  # Blank line before result
-                print(output)
-                self._last_was_newline = True
-            else:
-                # Tool use/results - simple output, no extra spacing
-                if not self._last_was_newline:
-                    print()  # Complete any pending line
-                print(output)
-                self._last_was_newline = True
-
-    def _format_response(self, response: Response) -> str:
-        """Format a response based on its type."""
-        if isinstance(response, InitResponse):
-            return self._format_init(response)
-        elif isinstance(response, MessageResponse):
-            return response.content  # Direct streaming output
-        elif isinstance(response, ToolUseResponse):
-            return self._format_tool_use(response)
-        elif isinstance(response, ToolResultResponse):
-            return self._format_tool_result(response)
-        elif isinstance(response, ErrorResponse):
-            return self._format_error(response)
-        elif isinstance(response, ResultResponse):
-            return self._format_result(response)
-        return ""
+        entry = self._formatters.get(response.kind)
+        if entry is None:
+            return
+        handler, mode = entry
+        output = handler(response)
+        if not output:
+            return
+
+        if mode == _STREAM:
+            # Streaming text - write as-is, flushed so partial lines show up live
+            self._write(output)
+            if self._live:
+                self._flush()
+            self._last_was_newline = output.endswith("\n")
+            return
+
+        # Everything else is a complete line; start it on a new line if needed
+        lead = "" if self._last_was_newline else "\n"
+        if mode == _BLOCK:
+            lead += "\n"  # Blank line before result
+        self._emit(lead + output + "\n")
+        self._last_was_newline = True
+
+    def _write(self, text: str) -> None:
+        """Write text to the output stream (stdout may be swapped while we live)."""
+        (sys.stdout if self._file is None else self._file).write(text)
+
+    def _flush(self) -> None:
+        """Flush the output stream."""
+        (sys.stdout if self._file is None else self._file).flush()
+
+    def _emit(self, text: str) -> None:
+        """Write a complete, non-streaming chunk of output."""
+        if self._fd is None:
+            self._write(text)
+            return
+
+        # Terminal fast path: bypass the text/buffer layers (after draining them)
+        self._flush()
+        data = text.encode("utf-8")
+        while data:
+            data = data[os.write(self._fd, data) :]
+
+    def _format_message(self, response: MessageResponse) -> str:
+        """Format streaming text."""
+        return response.content  # Direct streaming output
 
     def _format_init(self, response: InitResponse) -> str:
         """Format initialization message."""
@@ -93,32 +217,20 @@ class ResponseFormatter:
         self._current_tool = tool_name
         content = response.content
 
-        # Map tool names to emojis and simplified content
-        if tool_name == "LS":
-            # Just show the path being listed
-            return f"📁 ls {content}"
-        elif tool_name in ["Read", "NotebookRead"]:
-            # Just show filename
-            return f"📖 Reading {content}"
-        elif tool_name in ["Edit", "Write", "MultiEdit", "NotebookEdit"]:
-            # Just show filename
-            return f"✏️ Editing {content}"
-        elif tool_name == "Bash":
+        # Simple tools map straight to an emoji prefix or a fixed label
+        prefix = _TOOL_USE_PREFIXES.get(tool_name)
+        if prefix is not None:
+            return prefix + content
+        label = _TOOL_USE_LABELS.get(tool_name)
+        if label is not None:
+            return label
+
+        if tool_name == "Bash":
             # Show command but truncate if too long
-            if len(content) > 60:
-                return f"🔧 {content[:57]}..."
-            return f"🔧 {content}"
-        elif tool_name == "WebSearch":
-            return f"🔍 Searching: {content}"
-        elif tool_name == "WebFetch":
-            return f"🌐 Fetching: {content}"
-        elif tool_name == "TodoRead":
-            return "📋 Reading todos"
-        elif tool_name == "TodoWrite":
-            return "📝 Updating todos"
-        elif tool_name == "Task":
-            return f"🤖 Task: {content}"
-        elif tool_name in ["Glob", "Grep"]:
+            if len(content) > _BASH_MAX_LENGTH:
+                return "🔧 " + content[: _BASH_MAX_LENGTH - 3] + "..."
+            return "🔧 " + content
+        elif tool_name in ("Glob", "Grep"):
             # Show pattern only
             if " in " in content:
                 pattern = content.split(" in ")[0]
@@ -133,54 +245,49 @@ class ResponseFormatter:
         content = response.content
         tool = response.tool
 
-        if not content or not content.strip():
+        stripped = content.strip() if content else ""
+        if not stripped:
             return ""  # Don't show empty results
 
-        # Simplify output based on tool
+        # Tools whose result is always summarized the same way
+        summary = _TOOL_RESULT_SUMMARIES.get(tool)
+        if summary is not None:
+            return summary
+
+        # Simplify output based on tool (line counts via str.count, no list of lines)
         if tool == "Read":
             line_count = content.count("\n") + 1
             return f"  → Read {line_count} lines"
         elif tool == "LS":
             # Count files/directories
-            items = content.strip().split("\n")
-            return f"  → Found {len(items)} items"
-        elif tool in ["Edit", "MultiEdit"]:
-            # Show edit summary
-            return "  → File updated"
-        elif tool == "Write":
-            return "  → File written"
+            item_count = stripped.count("\n") + 1
+            return f"  → Found {item_count} items"
         elif tool == "Bash":
-            # Show first line of output if short, otherwise just indicate output
-            lines = content.strip().split("\n")
-            if len(lines) == 1 and len(lines[0]) < 60:
-                return f"  → {lines[0]}"
-            elif len(lines) > 1:
-                return f"  → Output: {len(lines)} lines"
+            # Show single-line output if short, otherwise just indicate output
+            line_count = stripped.count("\n") + 1
+            if line_count > 1:
+                return f"  → Output: {line_count} lines"
+            elif len(stripped) < 60:
+                return f"  → {stripped}"
             else:
                 return "  → Command completed"
-        elif tool in ["Glob", "Grep"]:
-            # Count matches
-            matches = content.strip().split("\n") if content.strip() else []
-            if matches:
-                return f"  → Found {len(matches)} matches"
-            else:
-                return "  → No matches found"
+        elif tool in ("Glob", "Grep"):
+            # Count matches (empty results were already filtered out above)
+            match_count = stripped.count("\n") + 1
+            return f"  → Found {match_count} matches"
         elif tool == "TodoRead":
-            # Count todos
-            import json
-
-            try:
-                todos = json.loads(content)
-                return f"  → {len(todos)} todos"
-            except Exception:
-                return "  → Todos listed"
-        elif tool == "TodoWrite":
-            return "  → Todos updated"
+            # Count todos; skip the parse when content can't be a JSON list/object
+            if content.lstrip().startswith(("[", "{")):
+                try:
+                    todos = json.loads(content)
+                    return f"  → {len(todos)} todos"
+                except Exception:
+                    pass
+            return "  → Todos listed"
         else:
             # For other tools, show brief summary
-            lines = content.strip().split("\n")
-            if len(lines) == 1 and len(lines[0]) < 80:
-                return f"  → {lines[0]}"
+            if "\n" not in stripped and len(stripped) < 80:
+                return f"  → {stripped}"
             else:
                 return "  → Completed"
 
@@ -201,38 +308,51 @@ class ResponseFormatter:
             return f"📊 next_session_tokens={token_count}"
 
     def _truncate_to_width(self, text: str, width: Optional[int] = None) -> str:
-        """Truncate text to fit terminal width using Rich."""
+        """Truncate text to fit terminal width using Rich's cell widths."""
         if width is None:
-            columns, _ = shutil.get_terminal_size(fallback=(80, 24))
-            width = columns
+            if self._term_width is None:
+                self._term_width = _terminal_width()
+            width = self._term_width
 
-        lines = text.split("\n")
+        # Room left for text before the "..." marker; never negative on tiny widths
+        limit = max(width - 3, 0)
+
+        # Short single-line printable ASCII (no newline or escape codes) fits as-is
+        if text.isascii() and text.isprintable() and len(text) <= limit:
+            return text
+
+        # Only the first lines are shown, so don't split the rest
+        lines = text.split("\n", _MAX_LINES)
         result = []
 
-        for _, line in enumerate(lines[:5]):  # Max 5 lines
-            # Create a Text object from the line (preserving ANSI codes)
-            text_obj = Text.from_ansi(line)
+        for line in lines[:_MAX_LINES]:
+            # Printable ASCII is one cell per character: plain length check and slice
+            if line.isascii() and line.isprintable():
+                if len(line) > limit:
+                    result.append(line[:limit] + "...")
+                else:
+                    result.append(line)
+                continue
+
+            # Strip ANSI codes, then measure terminal cells (wide CJK/emoji count as 2)
+            plain_text = Text.from_ansi(line).plain
 
             # Check if truncation is needed
-            if self.console.measure(text_obj).maximum > width - 3:
-                # Manually truncate to ensure we get exactly width-3 characters
-                plain_text = text_obj.plain
-                truncated = ""
+            if cell_len(plain_text) > width - 3:
+                # Cut at the last character that still fits in width-3 cells
                 current_width = 0
-
+                end = 0
                 for char in plain_text:
-                    char_text = Text(char)
-                    char_width = self.console.measure(char_text).maximum
-                    if current_width + char_width > width - 3:
+                    current_width += get_character_cell_size(char)
+                    if current_width > width - 3:
                         break
-                    truncated += char
-                    current_width += char_width
+                    end += 1
 
-                result.append(truncated + "...")
+                result.append(plain_text[:end] + "...")
             else:
                 result.append(line)
 
-        if len(lines) > 5:
+        if len(lines) > _MAX_LINES:
             result.append("...")
 
         return "\n".join(result)
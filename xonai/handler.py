@@ -6,29 +6,47 @@ and AI processing, separate from the xontrib registration.
 """
 
 import os
-import subprocess
-import sys
+from functools import cache
 
 from .ai import ClaudeAI, DummyAI
 from .display import ResponseFormatter
 
+# Commands that should show normal errors instead of AI processing (prefix match)
+_SKIP_PREFIXES = ("ls", "cd", "pwd", "git", "python", "pip", "claude")
 
-def get_ai_instance():
-    """Get appropriate AI instance based on environment."""
-    if os.environ.get("XONAI_DUMMY") == "1":
+
+@cache
+def _create_ai(dummy: bool):
+    """Create the AI instance for the given mode, reused across queries."""
+    if dummy:
         return DummyAI()
     else:
         return ClaudeAI()
 
 
+def get_ai_instance():
+    """Get appropriate AI instance based on environment."""
+    return _create_ai(os.environ.get("XONAI_DUMMY") == "1")
+
+
+@cache
+def _get_formatter() -> ResponseFormatter:
+    """Return the formatter shared by all queries."""
+    return ResponseFormatter()
+
+
 def process_natural_language_query(query: str) -> None:
     """Process a natural language query through AI."""
     ai = get_ai_instance()
-    formatter = ResponseFormatter()
+    formatter = _get_formatter()
+    formatter.reset()
 
     # Process the query through AI
-    for response in ai(query):
-        formatter.format(response)
+    try:
+        for response in ai(query):
+            formatter.format(response)
+    finally:
+        formatter.flush()
 
 
 def should_skip_command(args: list) -> bool:
@@ -36,19 +54,40 @@ def should_skip_command(args: list) -> bool:
     if not args:
         return True
 
-    # Skip common commands that should show normal errors
-    skip_prefixes = ["ls", "cd", "pwd", "git", "python", "pip", "claude"]
-    return any(args[0].startswith(prefix) for prefix in skip_prefixes)
+    # str.startswith checks the whole prefix tuple in C (exact names match too)
+    command: str = args[0]
+    return command.startswith(_SKIP_PREFIXES)
 
 
-def create_dummy_process():
-    """Create a dummy successful process."""
-    if sys.platform == "win32":
-        cmd = ["cmd", "/c", "exit", "0"]
-    else:
-        cmd = ["true"]
+class _DummyProcess:
+    """Already-exited stand-in for the subprocess.Popen attributes xonsh uses."""
+
+    # No pid keeps xonsh away from waitpid and process-group handling
+    pid = None
+    returncode = 0
+    stdin = stdout = stderr = None
+
+    def poll(self):
+        return 0
+
+    def wait(self, timeout=None):
+        return 0
+
+    def communicate(self, input=None, timeout=None):
+        return b"", b""
 
-    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    def send_signal(self, sig):
+        pass
+
+    def terminate(self):
+        pass
+
+    kill = terminate
+
+
+def create_dummy_process():
+    """Create a dummy successful process without spawning one."""
+    return _DummyProcess()
 
 
 def xonai_run_binary_handler(original_method, subprocess_spec, kwargs):
@@ -61,7 +100,7 @@ def xonai_run_binary_handler(original_method, subprocess_spec, kwargs):
         kwargs: Keyword arguments for the subprocess
 
     Returns:
-        subprocess.Popen: Either the original process or a dummy success process
+        Either the original process or a dummy success process
     """
     try:
         import xonsh.tools as xt